@@ -1,16 +1,42 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 import sqlite3
+import os
+from pathlib import Path
 
 # Title
 st.title("Employment & Workforce Analysis Dashboard")
 
-# Load Data and Store in SQLite Database
-@st.cache_data
+# Workforce metrics shown in the table and boxplot
+important_vars = ['Employment Rate', 'Unemployment Rate', 'Labor Force Participation Rate', 'Youth Unemployment Rate']
+
+# Load Data (cached as Parquet) and Store in SQLite Database
+# cache_resource shares one frame across reruns instead of unpickling a copy each time; callers only read it
+@st.cache_resource
 def load_data():
-    file_path = "FIdataWB.xlsx"
-    df = pd.read_excel(file_path, sheet_name='Sheet1', skiprows=3)
+    # The cache name carries a format version: bump it whenever load_data() changes what it stores,
+    # so a cache written by an older version is treated as stale instead of silently reused
+    xlsx, pq = Path("FIdataWB.xlsx"), Path("FIdataWB.v2.parquet")
+
+    # Reuse the parsed copy unless the spreadsheet has changed since it was written
+    # (a cache without its spreadsheet next to it is still usable)
+    if pq.exists() and (not xlsx.exists() or pq.stat().st_mtime >= xlsx.stat().st_mtime):
+        return pd.read_parquet(pq, engine="pyarrow", use_threads=True)
+
+    # Only parse the columns the dashboard uses
+    df = pd.read_excel(
+        xlsx, sheet_name='Sheet1', skiprows=3, engine='calamine',
+        usecols=[
+            'Country Name', 'Country Code', 'Region Code', 'Income Level Name', 'Year of survey',
+            'Employment to Population Ratio, aged 15-64', 'Unemployment Rate, aged 15-64',
+            'Labor Force Participation Rate, aged 15-64', 'Youth Unemployment Rate, aged 15-24'
+        ],
+        dtype={'Year of survey': 'Int16'}
+    )
 
     # Rename essential columns
     df.rename(columns={
@@ -25,9 +51,12 @@ def load_data():
         'Region Code': 'Region'
     }, inplace=True)
 
-    # Convert numeric columns
-    num_cols = ['Employment Rate', 'Unemployment Rate', 'Labor Force Participation Rate', 'Youth Unemployment Rate']
-    df[num_cols] = df[num_cols].apply(pd.to_numeric, errors='coerce')
+    # Convert numeric columns (float32 halves the bytes filtered and sent to Plotly)
+    df[important_vars] = df[important_vars].apply(pd.to_numeric, errors='coerce', downcast='float')
+
+    # Store the repeated labels as categories (small integer codes instead of Python strings)
+    for c in ['Country', 'Country Code', 'Region', 'Income Level']:
+        df[c] = df[c].astype('category')
 
     # **Step 1: Assign Continent Based on World Bank Region Code**
     continent_mapping = {
@@ -74,26 +103,116 @@ def load_data():
         "Australia": "Oceania", "New Zealand": "Oceania", "Fiji": "Oceania", "Papua New Guinea": "Oceania"
     }
 
-    # Assign missing continent values based on country mapping
-    df['Continent'] = df.apply(lambda row: country_to_continent.get(row['Country'], row['Continent']), axis=1)
+    # Assign missing continent values based on country mapping: look up each distinct country once,
+    # then gather by category code (code -1, a missing country, lands on the trailing None)
+    countries = df['Country'].cat
+    lut = np.array([country_to_continent.get(c) for c in countries.categories] + [None], dtype=object)
+    df['Continent'] = pd.Series(lut[countries.codes], index=df.index).fillna(df['Continent'])
 
     # Ensure no missing continent values
-    df['Continent'].fillna("Unknown", inplace=True)
+    df['Continent'] = df['Continent'].fillna("Unknown").astype('category')
 
-    # Store data in SQLite database
-    conn = sqlite3.connect("employment_data.db")
-    df.to_sql("employment", conn, if_exists="replace", index=False)
+    # Re-materialise once after the dtype changes so every column sits in a fresh contiguous block
+    df = df.copy()
+
+    # Store data in SQLite database (only reached when the Parquet cache is rebuilt). Like the Parquet cache
+    # below, build it in a per-process temp file and swap it in, so concurrent cold starts never race on the
+    # shared table and readers only ever open a complete database
+    db = Path("employment_data.db")
+    tmp_db = db.with_name(f"{db.name}.{os.getpid()}.tmp")
+    tmp_db.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_db)
+    # Nobody else can see the temp file, so no rollback journal is needed while it is built
+    conn.executescript(
+        "PRAGMA journal_mode=OFF; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; PRAGMA cache_size=-200000;"
+    )
+    df.to_sql("employment", conn, index=False)
+    # Let consumers of the database filter by year and country/continent without a table scan. The indexes
+    # are built before the file is swapped in, so readers never see the table without them
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_year_country ON employment("Year", "Country")')
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_year_continent ON employment("Year", "Continent")')
     conn.close()
+    tmp_db.replace(db)
+
+    # Cache the analysis-ready frame so later cold starts skip the Excel parse. Write to a per-process
+    # temp file and swap it in, so another server process starting up never reads a half-written cache
+    tmp = pq.with_name(f"{pq.name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp, engine="pyarrow", compression="zstd")
+    tmp.replace(pq)
 
     return df
 
 df = load_data()
 
+# Index the data once by (Year, Country) / (Year, Continent) so sidebar filters are lookups, not scans
+@st.cache_resource
+def indexed_data(key):
+    # Only the columns the table and charts use, so every slice handed downstream stays narrow
+    slim = load_data()[['Country', 'Country Code', 'Continent', 'Year', *important_vars]]
+    return slim.set_index(['Year', key]).sort_index()
+
+# Long (one row per metric) form for the boxplot, melted once rather than on every rerun
+@st.cache_resource
+def indexed_long_data(key):
+    long_df = load_data().melt(id_vars=['Country', 'Country Code', 'Continent', 'Year'], value_vars=important_vars,
+                               var_name='Metric', value_name='Value')
+    # Keep the values one contiguous float32 array so slicing and JSON encoding stay linear sweeps
+    long_df['Value'] = np.ascontiguousarray(long_df['Value'].to_numpy(dtype=np.float32))
+    return long_df.set_index(['Year', key]).sort_index()
+
+def select_rows(indexed, year, selected):
+    rows = indexed.xs(year, level='Year', drop_level=False)
+    return rows[rows.index.get_level_values(1).isin(selected)].reset_index()
+
+# Sidebar options only depend on the loaded data, so compute them once instead of on every rerun
+@st.cache_data
+def year_options():
+    return sorted(load_data()["Year"].dropna().unique().tolist(), reverse=True)
+
+@st.cache_data
+def country_options():
+    return sorted(load_data()["Country"].dropna().unique().tolist())
+
+@st.cache_data
+def continent_options():
+    return sorted(load_data()["Continent"].dropna().unique().tolist())
+
+# Figures are memoised as JSON per (display type, selection, year) so repeat selections skip the Plotly build.
+# Both charts order their traces by the (sorted) selection so each country/continent gets the same colour in each
+@st.cache_data(max_entries=128)
+def box_figure_json(display_type, selected, year):
+    key = 'Country' if display_type == "Countries" else 'Continent'
+    fig_box = px.box(
+        select_rows(indexed_long_data(key), year, selected),
+        x='Metric', y='Value', color=key, category_orders={key: list(selected)},
+        title=f'{display_type} Employment & Workforce Statistics for {year}'
+    )
+    return fig_box.to_json()
+
+@st.cache_data(max_entries=128)
+def map_figure_json(display_type, selected, year):
+    key = 'Country' if display_type == "Countries" else 'Continent'
+    # One marker per country is enough; the filtered rows repeat each country once per survey subsample
+    map_df = select_rows(indexed_data(key), year, selected).groupby(
+        ['Country Code', 'Country', 'Continent'], as_index=False, observed=True
+    ).size()
+    fig_map = px.scatter_geo(
+        map_df, locations="Country Code", hover_name=key,
+        title=f'Selected {display_type} on the Map ({year})',
+        size_max=10, color=key, category_orders={key: list(selected)}
+    )
+    return fig_map.to_json()
+
+# Placeholder shown when nothing is selected, built once instead of running Plotly Express on an empty frame
+@st.cache_resource
+def empty_figure():
+    return go.Figure()
+
 # Sidebar: Filters
 st.sidebar.header("🔍 Filters")
 
 # **Year Selection**
-available_years = sorted(df["Year"].dropna().unique(), reverse=True)
+available_years = year_options()
 selected_year = st.sidebar.selectbox("Select Year", available_years, index=0)
 
 # **Display Selection: Countries or Continents**
@@ -102,17 +221,19 @@ display_type = st.sidebar.radio("Select to display:", ["Countries", "Continents"
 if display_type == "Countries":
     selected_countries = st.sidebar.multiselect(
         "Select up to 3 Countries", 
-        df["Country"].dropna().unique(), 
-        default=df["Country"].dropna().unique()[:3]
+        country_options(), 
+        default=country_options()[:3]
     )
-    filtered_df = df[(df["Country"].isin(selected_countries)) & (df["Year"] == selected_year)]
+    filtered_df = select_rows(indexed_data("Country"), selected_year, selected_countries)
 else:
     selected_continent = st.sidebar.multiselect(
         "Select Continent", 
-        df["Continent"].dropna().unique(), 
-        default=df["Continent"].dropna().unique()[:2]
+        continent_options(), 
+        default=continent_options()[:2]
     )
-    filtered_df = df[(df["Continent"].isin(selected_continent)) & (df["Year"] == selected_year)]
+    filtered_df = select_rows(indexed_data("Continent"), selected_year, selected_continent)
+
+selection = tuple(sorted(selected_countries if display_type == "Countries" else selected_continent))
 
 # Display Data Table
 st.markdown("""
@@ -122,28 +243,21 @@ Some countries or regions may not appear for selected years due to the absence o
 If a country or region is missing for a year selected, it means no data was available for that specific period/year.
 """)
 st.subheader("📋 Selected Data Table")
-st.dataframe(filtered_df[['Country', 'Continent', 'Year', 'Employment Rate', 'Unemployment Rate', 
-                          'Labor Force Participation Rate', 'Youth Unemployment Rate']])
+st.dataframe(filtered_df[['Country', 'Continent', 'Year', *important_vars]])
 
 # Boxplot Visualization
 st.subheader("📊 Employment & Workforce Insights")
-fig_box = px.box(
-    filtered_df.melt(id_vars=['Country' if display_type == "Countries" else 'Continent'], 
-                     value_vars=['Employment Rate', 'Unemployment Rate', 'Labor Force Participation Rate', 'Youth Unemployment Rate'],
-                     var_name='Metric', value_name='Value'),
-    x='Metric', y='Value', color='Country' if display_type == "Countries" else 'Continent',
-    title=f'{display_type} Employment & Workforce Statistics for {selected_year}'
+st.plotly_chart(
+    pio.from_json(box_figure_json(display_type, selection, selected_year)) if selection else empty_figure(),
+    key="box_chart"
 )
-st.plotly_chart(fig_box)
 
 # World Map Visualization
 st.subheader("🌍 Global Representation")
-fig_map = px.scatter_geo(
-    filtered_df, locations="Country Code", hover_name="Country" if display_type == "Countries" else "Continent",
-    title=f'Selected {display_type} on the Map ({selected_year})',
-    size_max=10, color='Country' if display_type == "Countries" else 'Continent'
+st.plotly_chart(
+    pio.from_json(map_figure_json(display_type, selection, selected_year)) if selection else empty_figure(),
+    key="map_chart"
 )
-st.plotly_chart(fig_map)
 
 # Deployment Note
 st.markdown("🚀 **This dashboard is hosted on Streamlit and provides employment insights across different regions.**")